@@ -1,13 +1,14 @@
 import datetime
 import json
 import os
+import re
 import sys
 import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal, ROUND_HALF_UP
 from pathlib import Path 
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-from reportlab.lib.units import mm
-from reportlab.lib import colors
+import numpy as np
+from pdf_backend import new_document, render_invoice_page, format_tax_percentage
 
 def writable_data_path(filename):
     """
@@ -26,23 +27,66 @@ SKU_FILE = writable_data_path('sku_data.json')
 CUSTOMER_FILE = writable_data_path('customer_data.json')
 VEHICLE_FILE = writable_data_path('vehicle_data.json')
 
-DEFAULT_SKU_DATA = {
-    "Tomato Sauce": {"hsn": "2103", "cgst": 0.025, "sgst": 0.025, "weights": ["4.5 Kg", "650 mL", "5 L"]},
-    "Chilly Sauce": {"hsn": "2103", "cgst": 0.025, "sgst": 0.025, "weights": ["4.5 Kg", "650 mL", "5 L"]},
-    "Soya Sauce": {"hsn": "2103", "cgst": 0.025, "sgst": 0.025, "weights": ["4.5 Kg", "650 mL", "5 L"]},
-    "Vinegar": {"hsn": "2209", "cgst": 0.09, "sgst": 0.09, "weights": ["650 mL", "4.5 Kg", "5 L"]},
-    "Ganna Vinegar": {"hsn": "2209", "cgst": 0.09, "sgst": 0.09, "weights": ["650 mL", "4.5 Kg", "5 L"]},
-    "Jamun Vinegar": {"hsn": "2209", "cgst": 0.09, "sgst": 0.09, "weights": ["650 mL", "4.5 Kg", "5 L"]},
-    "Noodles": {"hsn": "1902", "cgst": 0.09, "sgst": 0.09, "weights": ["500 gm", "1 Kg"]},
-    "PET Bottle": {"hsn": "3923", "cgst": 0.09, "sgst": 0.09, "weights": []},
-    "PET Preform": {"hsn": "3923", "cgst": 0.09, "sgst": 0.09, "weights": []}
-}
+# SKU master data: one row per SKU as (name, hsn, cgst, sgst, weights).
+# The per-attribute columns below are all derived from this table, so they can't drift apart
+_SKU_TABLE = [
+    ("Tomato Sauce", "2103", 0.025, 0.025, ["4.5 Kg", "650 mL", "5 L"]),
+    ("Chilly Sauce", "2103", 0.025, 0.025, ["4.5 Kg", "650 mL", "5 L"]),
+    ("Soya Sauce", "2103", 0.025, 0.025, ["4.5 Kg", "650 mL", "5 L"]),
+    ("Vinegar", "2209", 0.09, 0.09, ["650 mL", "4.5 Kg", "5 L"]),
+    ("Ganna Vinegar", "2209", 0.09, 0.09, ["650 mL", "4.5 Kg", "5 L"]),
+    ("Jamun Vinegar", "2209", 0.09, 0.09, ["650 mL", "4.5 Kg", "5 L"]),
+    ("Noodles", "1902", 0.09, 0.09, ["500 gm", "1 Kg"]),
+    ("PET Bottle", "3923", 0.09, 0.09, []),
+    ("PET Preform", "3923", 0.09, 0.09, [])
+]
+SKU_NAMES = [name for name, *_ in _SKU_TABLE]
+SKU_IDX = {name: i for i, name in enumerate(SKU_NAMES)}
+SKU_HSN = {name: hsn for name, hsn, *_ in _SKU_TABLE}
+SKU_CGST = np.array([cgst for _, _, cgst, _, _ in _SKU_TABLE])
+SKU_SGST = np.array([sgst for _, _, _, sgst, _ in _SKU_TABLE])
+SKU_WEIGHTS = {name: weights for name, *_, weights in _SKU_TABLE}
+
+def sku(name):
+    """Row view of a single SKU in the dict shape the UI works with"""
+    i = SKU_IDX[name]
+    return {"hsn": SKU_HSN[name], "cgst": float(SKU_CGST[i]), "sgst": float(SKU_SGST[i]), "weights": list(SKU_WEIGHTS[name])}
+
+DEFAULT_SKU_DATA = {name: sku(name) for name in SKU_NAMES}
 DEFAULT_CUSTOMER_DATA = {"Rudauli": [{"name": "Prakash & Sons", "id_type": "GSTN", "id_value": "09AUHPP5426C1ZM"}]}
 DEFAULT_VEHICLE_DATA = {"vehicles": []}
 
 # For web deployment, we'll use temp directory for invoice generation
 INVOICE_SAVE_PATH = Path(tempfile.gettempdir()) / "invoices"
 
+# JSON encoder for data files, exports and change hashes: orjson when available, stdlib otherwise.
+# Output is bytes so callers can write files in binary mode or hash it directly.
+try:
+    import orjson
+
+    def dumps_json(obj):
+        return orjson.dumps(obj)
+
+    def dumps_json_indented(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    def dumps_json(obj):
+        return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+    def dumps_json_indented(obj):
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+# Anything other than letters, digits, space, '_' or '-' is dropped from folder/file names
+_UNSAFE_NAME_RE = re.compile(r'[^\w \-]+')
+
+# Directories already created by this process, so repeat invoices skip the stat calls
+_mkdir_cache = set()
+
+def _ensure_dir(path):
+    if path and path not in _mkdir_cache:
+        os.makedirs(path, exist_ok=True)
+        _mkdir_cache.add(path)
+
 def load_data(file_path, default_data):
     """
     Modified for web - since we can't persist files, we'll always return default data
@@ -57,46 +101,97 @@ def save_data(file_path, data):
     """
     print(f"Data would be saved to {file_path} (web version uses session state)")
 
-def recalculate_totals(items_list):
-    total_amount = sum(item['amount'] for item in items_list)
-    total_tax = sum(item['tax'] for item in items_list)
+# Money (rate, amount, tax, total and the invoice totals) is carried as integer paise
+# end-to-end and only turned into rupee strings when rendered. Rounding is half-up throughout.
+def to_paise(rupees):
+    # Via the decimal repr, so e.g. 12.345 rounds up instead of landing on 1234.4999...
+    return int(Decimal(str(rupees)).scaleb(2).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+def rate_bp(decimal_rate):
+    """Tax rate as integer basis points, e.g. 0.025 -> 250"""
+    return np.rint(np.asarray(decimal_rate, dtype=np.float64) * 10000).astype(np.int64)
+
+# Invoice items are held column-wise: {'name': [...], 'qty': [...], ...}, one list per field.
+# Serial numbers are not stored; rows are numbered by position when displayed or rendered.
+# What the caller supplies per item; amount, tax and total are derived by price_items
+ITEM_INPUT_FIELDS = ('name', 'qty', 'hsn', 'rate', 'cgst', 'sgst')
+
+def price_items(items):
+    """
+    Fill in amount, tax and total for column-wise items that carry qty, rate (paise), cgst and sgst
+    The arithmetic runs over whole columns in NumPy; results come back as plain int lists
+    """
+    qty = np.asarray(items['qty'], dtype=np.int64)
+    rate = np.asarray(items['rate'], dtype=np.int64)
+    amount = rate * qty
+    bp = rate_bp(items['cgst']) + rate_bp(items['sgst'])
+    # Integer half-up: 1250 paise at 5% is 62.5 -> 63, never rounded to even
+    tax = (amount * bp + 5000) // 10000
+    # Fresh lists, so the result doesn't share columns the caller keeps appending to
+    priced = {field: list(column) for field, column in items.items()}
+    priced['amount'] = amount.tolist()
+    priced['tax'] = tax.tolist()
+    priced['total'] = (amount + tax).tolist()
+    return priced
+
+def recalculate_totals(items):
+    total_amount = int(np.sum(np.asarray(items['amount'], dtype=np.int64)))
+    total_tax = int(np.sum(np.asarray(items['tax'], dtype=np.int64)))
     return {"amount": total_amount, "tax": total_tax, "grand_total": total_amount + total_tax}
 
 def apply_price_adjustments(invoice_items):
     # This logic may need updating based on new item names
-    return invoice_items, recalculate_totals(invoice_items), []
+    items = price_items(invoice_items)
+    return items, recalculate_totals(items), []
 
-def format_tax_percentage(decimal_rate):
-    """Format tax rate as percentage"""
-    percentage = decimal_rate * 100
-    if percentage == int(percentage):
-        return f"{int(percentage)}%"
-    else:
-        return f"{percentage:.2f}%"
+def stream_invoices_ndjson(invoice_iter, sink):
+    """
+    Write invoices as JSON Lines (one invoice per line) to a binary sink
+    Each invoice is encoded and written on its own, so the full export is never held as one document
+    """
+    for invoice_data in invoice_iter:
+        sink.write(dumps_json(invoice_data))
+        sink.write(b"\n")
 
-def generate_pdf(invoice_data, output_path=None):
+def _write_pdf_file(path, pdf_bytes):
+    # fpdf2 hands back the whole document as one bytes object
+    try:
+        Path(path).write_bytes(pdf_bytes)
+    except FileNotFoundError:
+        # The directory was cached as created but has since been removed (e.g. by a tmp cleaner)
+        folder = os.path.dirname(path)
+        _mkdir_cache.discard(folder)
+        _ensure_dir(folder)
+        Path(path).write_bytes(pdf_bytes)
+
+def generate_pdf(invoice_data, output_path=None, output_stream=None):
     """
     Modified to accept custom output path for web deployment
     If output_path is provided, saves to that location instead of default folder structure
+    If output_stream is provided (e.g. io.BytesIO), the PDF is written there and
+    its bytes are returned without touching the filesystem
     """
-    if output_path:
+    if output_stream is not None:
+        # For web deployment - PDF goes straight to the in-memory buffer
+        full_path = None
+    elif output_path:
         # For web deployment - save to specified temp file
         full_path = output_path
         # Create directory if it doesn't exist
-        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        _ensure_dir(os.path.dirname(full_path))
     else:
         # Original logic for desktop app
         place_of_supply = invoice_data['meta']['place_of_supply']
         customer_name = invoice_data['buyer']['name']
         
         # Sanitize folder names (remove invalid characters)
-        sanitized_place = "".join(c for c in place_of_supply if c.isalnum() or c in (' ', '_', '-')).strip()
-        sanitized_customer = "".join(c for c in customer_name if c.isalnum() or c in (' ', '_', '-')).strip()
+        sanitized_place = _UNSAFE_NAME_RE.sub('', place_of_supply).strip()
+        sanitized_customer = _UNSAFE_NAME_RE.sub('', customer_name).strip()
         
         # Create nested folder structure
         place_folder = os.path.join(INVOICE_SAVE_PATH, sanitized_place)
         customer_folder = os.path.join(place_folder, sanitized_customer)
-        os.makedirs(customer_folder, exist_ok=True)
+        _ensure_dir(customer_folder)
         
         # Create filename: customername_date_invoiceno.pdf
         sanitized_date = invoice_data['meta']['date'].replace('/', '-')
@@ -104,159 +199,16 @@ def generate_pdf(invoice_data, output_path=None):
         filename = f"{sanitized_customer}_{sanitized_date}_{inv_no}.pdf"
         full_path = os.path.join(customer_folder, filename)
     
-    # PDF generation code remains exactly the same
-    c = canvas.Canvas(full_path, pagesize=A4)
-    PAGE_W, PAGE_H = A4
-    MARGIN_X = 15*mm
-    MARGIN_Y = 15*mm
-    INNER_W = PAGE_W - 2*MARGIN_X
-    HALF_H = (PAGE_H - 2*MARGIN_Y)/2.0
-    LINE_HEIGHT = 14
-    SECTION_GAP = 12
-    RUPEE = "Rs. "
-    seller = {
-        "name": "M/s Sukhrani Enterprises", 
-        "addr": "63 B1 Charari Lal Bangla Kanpur, Uttar Pradesh", 
-        "contact": "8604311514, GSTIN: 09AJBPA644Q2ZZ"
-    }
-    
-    def money(v): 
-        return f"{RUPEE}{v:,.2f}"
-    
-    def draw_line(c, x1, y, x2): 
-        c.setLineWidth(0.6)
-        c.line(x1, y, x2, y)
+    # Layout helpers live in pdf_backend (fpdf2)
+    pdf = new_document()
+    render_invoice_page(pdf, invoice_data)
     
-    def draw_header(c, x, y, copy_label):
-        c.setFont("Helvetica-Bold", 16)
-        c.drawString(x, y, seller["name"])
-        c.setFont("Helvetica", 10)
-        c.drawString(x, y-LINE_HEIGHT, seller["addr"])
-        c.drawString(x, y-2*LINE_HEIGHT, seller["contact"])
-        right = x+INNER_W
-        c.setFont("Helvetica-Bold", 22)
-        c.drawRightString(right, y, "INVOICE")
-        c.setFont("Helvetica", 10)
-        c.drawRightString(right, y-(LINE_HEIGHT*1.2), copy_label)
-        draw_line(c, x, y-(LINE_HEIGHT*2.8), right)
-        return y-(LINE_HEIGHT*2.8)-SECTION_GAP
+    pdf_bytes = pdf.output()
+    if output_stream is not None:
+        output_stream.write(pdf_bytes)
+        return output_stream.getvalue()
     
-    def draw_billing_meta(c, x, y):
-        c.setFont("Helvetica-Bold", 10)
-        c.drawString(x, y, "Bill To:")
-        buyer_y = y-LINE_HEIGHT*1.2
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(x, buyer_y, invoice_data['buyer']['name'])
-        c.setFont("Helvetica", 10)
-        c.drawString(x, buyer_y-LINE_HEIGHT, f"{invoice_data['buyer']['id_type']}: {invoice_data['buyer']['id_value']}")
-        c.drawString(x, buyer_y-2*LINE_HEIGHT, f"Place of Supply: {invoice_data['meta']['place_of_supply']}")
-        right = x+INNER_W
-        c.drawRightString(right, y, f"Invoice #: {invoice_data['meta']['no']}")
-        c.drawRightString(right, y-LINE_HEIGHT, f"Bill Date: {invoice_data['meta']['date']}")
-        c.drawRightString(right, y-2*LINE_HEIGHT, f"Vehicle No: {invoice_data['meta']['vehicle_no']}")
-        draw_line(c, x, buyer_y-(LINE_HEIGHT*2.8), right)
-        return buyer_y-(LINE_HEIGHT*2.8)-SECTION_GAP
-    
-    def draw_items_table(c, x, y):
-        COLS = [
-            ("S.N.",0.05,"C"),("Items",0.25,"L"),("Qty.",0.06,"C"),("HSN",0.08,"C"),
-            ("Rate",0.11,"R"),("Amount",0.13,"R"),("CGST",0.06,"C"),("SGST",0.06,"C"),
-            ("Tax",0.12,"R"),("Total",0.14,"R")
-        ]
-        scale = 1.0/sum(w for _,w,_ in COLS)
-        COLS = [(h, w*scale, a) for h,w,a in COLS]
-        col_x = [x]
-        for _, width_frac, _ in COLS: 
-            col_x.append(col_x[-1] + INNER_W*width_frac)
-        
-        right = x+INNER_W
-        table_top, HEADER_H, ROW_H = y, 18, 16
-        c.setFillColorRGB(0.95,0.95,0.95)
-        c.rect(x, table_top-HEADER_H, INNER_W, HEADER_H, fill=1, stroke=0)
-        c.setFillColor(colors.black)
-        c.setFont("Helvetica-Bold", 9)
-        
-        for i, (label, _, align) in enumerate(COLS):
-            if align=="L": 
-                c.drawString(col_x[i]+5, table_top-12, label)
-            elif align=="C": 
-                c.drawCentredString((col_x[i]+col_x[i+1])/2, table_top-12, label)
-            else: 
-                c.drawRightString(col_x[i+1]-5, table_top-12, label)
-        
-        c.setFont("Helvetica", 9)
-        current_y = table_top-HEADER_H
-        
-        for item in invoice_data['items']:
-            current_y -= ROW_H
-            cgst_display = format_tax_percentage(item['cgst'])
-            sgst_display = format_tax_percentage(item['sgst'])
-            
-            data = [
-                str(item['sn']), 
-                item['name'], 
-                str(item['qty']), 
-                item['hsn'], 
-                money(item['rate']), 
-                money(item['amount']), 
-                cgst_display,
-                sgst_display,
-                money(item['tax']),
-                money(item['total'])
-            ]
-            
-            for i, text in enumerate(data):
-                align = COLS[i][2]
-                if align=="L": 
-                    c.drawString(col_x[i]+5, current_y+5, text)
-                elif align=="C": 
-                    c.drawCentredString((col_x[i]+col_x[i+1])/2, current_y+5, text)
-                else: 
-                    c.drawRightString(col_x[i+1]-5, current_y+5, text)
-        
-        table_bottom = current_y
-        c.rect(x, table_bottom, INNER_W, table_top-table_bottom)
-        c.line(x, table_top-HEADER_H, right, table_top-HEADER_H)
-        
-        for i in range(1, len(COLS)): 
-            c.line(col_x[i], table_bottom, col_x[i], table_top)
-        
-        for i in range(len(invoice_data['items'])): 
-            c.line(x, table_top-HEADER_H-(i*ROW_H), right, table_top-HEADER_H-(i*ROW_H))
-        
-        return table_bottom
-    
-    def draw_footer(c, x, y):
-        right = x+INNER_W
-        labels_x, values_x = right-180, right-5
-        c.setFont("Helvetica", 11)
-        c.drawString(labels_x, y-LINE_HEIGHT, "Total Amount")
-        c.drawRightString(values_x, y-LINE_HEIGHT, money(invoice_data['totals']['amount']))
-        c.drawString(labels_x, y-(LINE_HEIGHT*2), "Total Tax")
-        c.drawRightString(values_x, y-(LINE_HEIGHT*2), money(invoice_data['totals']['tax']))
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(labels_x, y-(LINE_HEIGHT*3), "GRAND TOTAL")
-        c.drawRightString(values_x, y-(LINE_HEIGHT*3), money(invoice_data['totals']['grand_total']))
-        draw_line(c, x, y-(LINE_HEIGHT*3.8), right)
-        c.setFont("Helvetica", 10)
-        c.drawString(x, y-(LINE_HEIGHT*4.8), "Make all checks payable to Sukhrani Enterprises")
-        c.drawRightString(right, y-(LINE_HEIGHT*4.8), "Signature")
-    
-    def draw_invoice_copy(c, x, y_start, copy_label):
-        y = draw_header(c, x, y_start, copy_label)
-        y = draw_billing_meta(c, x, y)
-        table_bottom = draw_items_table(c, x, y)
-        draw_footer(c, x, table_bottom-SECTION_GAP)
-    
-    draw_invoice_copy(c, MARGIN_X, PAGE_H-MARGIN_Y, "Original Copy")
-    mid_y = MARGIN_Y+HALF_H
-    c.setDash(3, 2)
-    c.line(MARGIN_X, mid_y, PAGE_W-MARGIN_X, mid_y)
-    c.setDash()
-    draw_invoice_copy(c, MARGIN_X, mid_y-30, "Duplicate Copy")
-    
-    c.showPage()
-    c.save()
+    _write_pdf_file(full_path, pdf_bytes)
     print(f"\nInvoice generated successfully: {full_path}")
     
     # For web deployment, don't try to open the file automatically
@@ -266,4 +218,48 @@ def generate_pdf(invoice_data, output_path=None):
         except Exception as e:
             print(f"Could not automatically open the PDF. Error: {e}")
     
-    return full_path  # Return the path for web app to access the file
\ No newline at end of file
+    return full_path  # Return the path for web app to access the file
+
+def generate_pdf_batch(invoices, output_path=None, output_stream=None):
+    """
+    Render several invoices into one multi-page PDF, one invoice per page
+    The document header and trailer are written once for the whole batch
+    """
+    if output_path is None and output_stream is None:
+        raise ValueError("generate_pdf_batch needs an output_path or an output_stream")
+    
+    pdf = new_document()
+    for invoice_data in invoices:
+        render_invoice_page(pdf, invoice_data)
+    
+    pdf_bytes = pdf.output()
+    if output_stream is not None:
+        output_stream.write(pdf_bytes)
+        return output_stream.getvalue()
+    
+    _ensure_dir(os.path.dirname(output_path))
+    _write_pdf_file(output_path, pdf_bytes)
+    return output_path
+
+def _generate_one(job):
+    invoice_data, output_path = job
+    return generate_pdf(invoice_data, output_path)
+
+def generate_pdfs_bulk(invoice_list, out_dir):
+    """
+    Generate many invoices at once, with up to one worker process per core
+    Each invoice is independent, so they render in parallel; returns the file paths
+    """
+    jobs = []
+    for i, invoice_data in enumerate(invoice_list, 1):
+        sanitized_date = invoice_data['meta']['date'].replace('/', '-')
+        # The position keeps names unique when invoice number and date repeat
+        filename = f"invoice_{invoice_data['meta']['no']}_{sanitized_date}_{i}.pdf"
+        jobs.append((invoice_data, os.path.join(out_dir, filename)))
+    
+    # A single invoice isn't worth starting a worker (and re-importing numpy/fpdf2) for
+    if len(jobs) < 2:
+        return [_generate_one(job) for job in jobs]
+    
+    with ProcessPoolExecutor(max_workers=min(len(jobs), os.cpu_count() or 1)) as ex:
+        return list(ex.map(_generate_one, jobs))
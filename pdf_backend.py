@@ -0,0 +1,249 @@
+"""
+fpdf2 drawing helpers for the invoice layout.
+
+The layout arithmetic is kept exactly as it was written for ReportLab: all
+coordinates are in points with the origin at the bottom-left of the page.
+The small primitive wrappers below flip the y axis once, since fpdf2 puts
+the origin at the top-left.
+"""
+from functools import lru_cache
+
+mm = 72 / 25.4
+A4 = (210*mm, 297*mm)
+
+PAGE_W, PAGE_H = A4
+MARGIN_X = 15*mm
+MARGIN_Y = 15*mm
+INNER_W = PAGE_W - 2*MARGIN_X
+HALF_H = (PAGE_H - 2*MARGIN_Y)/2.0
+LINE_HEIGHT = 14
+SECTION_GAP = 12
+RUPEE = "Rs. "
+# Table header shading (0.95 grey), as 0-255 RGB for fpdf2
+HEADER_FILL = (242, 242, 242)
+# Core PDF font, so there is nothing to embed or register per document
+FONT = "Helvetica"
+BOLD = "B"
+REGULAR = ""
+SELLER = {
+    "name": "M/s Sukhrani Enterprises",
+    "addr": "63 B1 Charari Lal Bangla Kanpur, Uttar Pradesh",
+    "contact": "8604311514, GSTIN: 09AJBPA644Q2ZZ"
+}
+
+def new_document():
+    """Create an empty A4 portrait document measured in points"""
+    # fpdf2 is imported on first use so pages that never render a PDF don't pay for it
+    from fpdf import FPDF
+    pdf = FPDF(orientation='P', unit='pt', format='A4')
+    pdf.set_auto_page_break(False)
+    pdf.set_line_width(0.6)
+    return pdf
+
+@lru_cache(maxsize=4096)
+def money(paise):
+    """Format an integer paise amount as rupees, e.g. 190378 -> 'Rs. 1,903.78'"""
+    sign = "-" if paise < 0 else ""
+    rupees, p = divmod(abs(paise), 100)
+    return f"{sign}{RUPEE}{rupees:,}.{p:02d}"
+
+def _compute_pct(decimal_rate):
+    percentage = decimal_rate * 100
+    if percentage == int(percentage):
+        return f"{int(percentage)}%"
+    else:
+        return f"{percentage:.2f}%"
+
+# GST slabs in use; anything else is formatted once and remembered
+_PCT_CACHE = {rate: _compute_pct(rate) for rate in (0.0, 0.025, 0.06, 0.09)}
+
+def format_tax_percentage(decimal_rate):
+    """Format tax rate as percentage"""
+    pct = _PCT_CACHE.get(decimal_rate)
+    if pct is None:
+        pct = _PCT_CACHE[decimal_rate] = _compute_pct(decimal_rate)
+    return pct
+
+def pdf_text(s):
+    """
+    The core fonts only cover Latin-1; other characters (Devanagari names, the rupee sign)
+    are drawn as '?' instead of failing the whole invoice, like ReportLab's missing-glyph box
+    """
+    return s if s.isascii() else s.encode('latin-1', 'replace').decode('latin-1')
+
+# Primitives (ReportLab-style bottom-left coordinates)
+def draw_string(pdf, x, y, s):
+    pdf.text(x, PAGE_H-y, pdf_text(s))
+
+def draw_right_string(pdf, x, y, s):
+    s = pdf_text(s)
+    pdf.text(x-pdf.get_string_width(s), PAGE_H-y, s)
+
+def draw_centred_string(pdf, x, y, s):
+    s = pdf_text(s)
+    pdf.text(x-pdf.get_string_width(s)/2.0, PAGE_H-y, s)
+
+def line(pdf, x1, y1, x2, y2):
+    pdf.line(x1, PAGE_H-y1, x2, PAGE_H-y2)
+
+def rect(pdf, x, y, w, h, style=None):
+    pdf.rect(x, PAGE_H-y-h, w, h, style=style)
+
+def draw_line(pdf, x1, y, x2):
+    pdf.set_line_width(0.6)
+    line(pdf, x1, y, x2, y)
+
+# Invoice sections
+_TITLE = "INVOICE"
+_title_w = None
+
+def draw_seller_block(pdf, x, y):
+    """Static seller artwork shared by every copy on the page"""
+    pdf.set_font(FONT, BOLD, 16)
+    draw_string(pdf, x, y, SELLER["name"])
+    pdf.set_font(FONT, REGULAR, 10)
+    draw_string(pdf, x, y-LINE_HEIGHT, SELLER["addr"])
+    draw_string(pdf, x, y-2*LINE_HEIGHT, SELLER["contact"])
+    pdf.set_font(FONT, BOLD, 22)
+    # Core font metrics never change, so measure the title only once
+    global _title_w
+    if _title_w is None:
+        _title_w = pdf.get_string_width(_TITLE)
+    draw_string(pdf, x+INNER_W-_title_w, y, _TITLE)
+
+def draw_header(pdf, x, y, copy_label):
+    draw_seller_block(pdf, x, y)
+    right = x+INNER_W
+    pdf.set_font(FONT, REGULAR, 10)
+    draw_right_string(pdf, right, y-(LINE_HEIGHT*1.2), copy_label)
+    draw_line(pdf, x, y-(LINE_HEIGHT*2.8), right)
+    return y-(LINE_HEIGHT*2.8)-SECTION_GAP
+
+def draw_billing_meta(pdf, x, y, invoice_data):
+    pdf.set_font(FONT, BOLD, 10)
+    draw_string(pdf, x, y, "Bill To:")
+    buyer_y = y-LINE_HEIGHT*1.2
+    pdf.set_font(FONT, BOLD, 12)
+    draw_string(pdf, x, buyer_y, invoice_data['buyer']['name'])
+    pdf.set_font(FONT, REGULAR, 10)
+    draw_string(pdf, x, buyer_y-LINE_HEIGHT, f"{invoice_data['buyer']['id_type']}: {invoice_data['buyer']['id_value']}")
+    draw_string(pdf, x, buyer_y-2*LINE_HEIGHT, f"Place of Supply: {invoice_data['meta']['place_of_supply']}")
+    right = x+INNER_W
+    draw_right_string(pdf, right, y, f"Invoice #: {invoice_data['meta']['no']}")
+    draw_right_string(pdf, right, y-LINE_HEIGHT, f"Bill Date: {invoice_data['meta']['date']}")
+    draw_right_string(pdf, right, y-2*LINE_HEIGHT, f"Vehicle No: {invoice_data['meta']['vehicle_no']}")
+    draw_line(pdf, x, buyer_y-(LINE_HEIGHT*2.8), right)
+    return buyer_y-(LINE_HEIGHT*2.8)-SECTION_GAP
+
+COLS = [
+    ("S.N.",0.05,"C"),("Items",0.25,"L"),("Qty.",0.06,"C"),("HSN",0.08,"C"),
+    ("Rate",0.11,"R"),("Amount",0.13,"R"),("CGST",0.06,"C"),("SGST",0.06,"C"),
+    ("Tax",0.12,"R"),("Total",0.14,"R")
+]
+_scale = 1.0/sum(w for _,w,_ in COLS)
+COLS = [(h, w*_scale, a) for h,w,a in COLS]
+
+def format_item_rows(items):
+    """
+    Turn the column-wise items into the table's cell strings, one tuple per row
+    Done once per invoice and shared by the Original and Duplicate copies
+    """
+    return list(zip(
+        [str(sn) for sn in range(1, len(items['name'])+1)],
+        items['name'],
+        [str(qty) for qty in items['qty']],
+        items['hsn'],
+        [money(v) for v in items['rate']],
+        [money(v) for v in items['amount']],
+        [format_tax_percentage(r) for r in items['cgst']],
+        [format_tax_percentage(r) for r in items['sgst']],
+        [money(v) for v in items['tax']],
+        [money(v) for v in items['total']]
+    ))
+
+def column_drawers(pdf, col_x):
+    """One draw callable per column with its anchor x already resolved"""
+    draw_fns = []
+    for i, (_, _, align) in enumerate(COLS):
+        if align=="L":
+            draw_fns.append(lambda s, y, cx=col_x[i]+5: draw_string(pdf, cx, y, s))
+        elif align=="C":
+            draw_fns.append(lambda s, y, cx=(col_x[i]+col_x[i+1])/2: draw_centred_string(pdf, cx, y, s))
+        else:
+            draw_fns.append(lambda s, y, cx=col_x[i+1]-5: draw_right_string(pdf, cx, y, s))
+    return draw_fns
+
+def draw_items_table(pdf, x, y, formatted_rows):
+    from fpdf.enums import PathPaintRule
+    col_x = [x]
+    for _, width_frac, _ in COLS:
+        col_x.append(col_x[-1] + INNER_W*width_frac)
+    draw_fns = column_drawers(pdf, col_x)
+
+    right = x+INNER_W
+    table_top, HEADER_H, ROW_H = y, 18, 16
+    pdf.set_fill_color(*HEADER_FILL)
+    rect(pdf, x, table_top-HEADER_H, INNER_W, HEADER_H, style="F")
+    pdf.set_font(FONT, BOLD, 9)
+
+    for fn, (label, _, _) in zip(draw_fns, COLS):
+        fn(label, table_top-12)
+
+    pdf.set_font(FONT, REGULAR, 9)
+    current_y = table_top-HEADER_H
+
+    for row in formatted_rows:
+        current_y -= ROW_H
+        for fn, text in zip(draw_fns, row):
+            fn(text, current_y+5)
+
+    table_bottom = current_y
+
+    # Border, column separators and row separators go out as one stroked path
+    with pdf.new_path(paint_rule=PathPaintRule.STROKE) as grid:
+        grid.style.auto_close = False
+        grid.rectangle(x, PAGE_H-table_top, INNER_W, table_top-table_bottom)
+
+        for i in range(1, len(COLS)):
+            grid.move_to(col_x[i], PAGE_H-table_bottom)
+            grid.line_to(col_x[i], PAGE_H-table_top)
+
+        for i in range(len(formatted_rows)):
+            row_y = PAGE_H-(table_top-HEADER_H-(i*ROW_H))
+            grid.move_to(x, row_y)
+            grid.line_to(right, row_y)
+
+    return table_bottom
+
+def draw_footer(pdf, x, y, invoice_data):
+    right = x+INNER_W
+    labels_x, values_x = right-180, right-5
+    pdf.set_font(FONT, REGULAR, 11)
+    draw_string(pdf, labels_x, y-LINE_HEIGHT, "Total Amount")
+    draw_right_string(pdf, values_x, y-LINE_HEIGHT, money(invoice_data['totals']['amount']))
+    draw_string(pdf, labels_x, y-(LINE_HEIGHT*2), "Total Tax")
+    draw_right_string(pdf, values_x, y-(LINE_HEIGHT*2), money(invoice_data['totals']['tax']))
+    pdf.set_font(FONT, BOLD, 12)
+    draw_string(pdf, labels_x, y-(LINE_HEIGHT*3), "GRAND TOTAL")
+    draw_right_string(pdf, values_x, y-(LINE_HEIGHT*3), money(invoice_data['totals']['grand_total']))
+    draw_line(pdf, x, y-(LINE_HEIGHT*3.8), right)
+    pdf.set_font(FONT, REGULAR, 10)
+    draw_string(pdf, x, y-(LINE_HEIGHT*4.8), "Make all checks payable to Sukhrani Enterprises")
+    draw_right_string(pdf, right, y-(LINE_HEIGHT*4.8), "Signature")
+
+def draw_invoice_copy(pdf, x, y_start, copy_label, invoice_data, formatted_rows):
+    y = draw_header(pdf, x, y_start, copy_label)
+    y = draw_billing_meta(pdf, x, y, invoice_data)
+    table_bottom = draw_items_table(pdf, x, y, formatted_rows)
+    draw_footer(pdf, x, table_bottom-SECTION_GAP, invoice_data)
+
+def render_invoice_page(pdf, invoice_data):
+    """Add a page holding the Original and Duplicate copies of one invoice"""
+    formatted_rows = format_item_rows(invoice_data['items'])
+    pdf.add_page()
+    draw_invoice_copy(pdf, MARGIN_X, PAGE_H-MARGIN_Y, "Original Copy", invoice_data, formatted_rows)
+    mid_y = MARGIN_Y+HALF_H
+    pdf.set_dash_pattern(dash=3, gap=2)
+    line(pdf, MARGIN_X, mid_y, PAGE_W-MARGIN_X, mid_y)
+    pdf.set_dash_pattern()
+    draw_invoice_copy(pdf, MARGIN_X, mid_y-30, "Duplicate Copy", invoice_data, formatted_rows)
@@ -1,13 +1,28 @@
 import streamlit as st
-import pandas as pd
-import json
+import numpy as np
+import copy
 import datetime
-import tempfile
+import hashlib
+import io
 import os
+import re
+import sys
+from itertools import compress, islice
 
 # Import your existing backend
 import invoice_app as backend
 
+# Vehicle numbers look like "UP78 JT 9555": alphanumeric code and series, then the number.
+# Code and series are checked on their own, so a space inside either can't slip through the join
+_VEH_PART_RE = re.compile(r'[A-Z0-9]+')
+
+def normalize_vehicle(code, series, number):
+    """Upper-cased 'CODE SERIES number' shared by add, edit and the editor; None if it doesn't validate"""
+    code, series, number = code.strip().upper(), series.strip().upper(), number.strip()
+    if not (_VEH_PART_RE.fullmatch(code) and _VEH_PART_RE.fullmatch(series) and number):
+        return None
+    return f"{code} {series} {number}"
+
 # Configure Streamlit
 st.set_page_config(
     page_title="Sukhrani Enterprises Invoice System",
@@ -15,40 +30,396 @@ st.set_page_config(
     layout="wide"
 )
 
-def load_existing_data():
-    """Load data from your existing JSON files"""
+# Data file names as the web layer has always used them, relative to the working directory.
+# Distinct from backend.SKU_FILE & co., which resolve to the temp directory.
+SKU_DATA_NAME = 'sku_data.json'
+CUSTOMER_DATA_NAME = 'customer_data.json'
+VEHICLE_DATA_NAME = 'vehicle_data.json'
+
+def file_mtimes():
+    """Modification time (ns) of each data file, None if it doesn't exist"""
+    mtimes = {}
+    for path in (SKU_DATA_NAME, CUSTOMER_DATA_NAME, VEHICLE_DATA_NAME):
+        try:
+            mtimes[path] = os.stat(path).st_mtime_ns
+        except OSError:
+            mtimes[path] = None
+    return mtimes
+
+# Parsed data files are shared across sessions; each caller gets its own copy.
+# The mtime is part of the cache key, so an edited file is never served stale.
+@st.cache_data(show_spinner=False, ttl=3600)
+def _load_sku(mtime_ns=None):
+    return backend.load_data(SKU_DATA_NAME, backend.DEFAULT_SKU_DATA)
+
+@st.cache_data(show_spinner=False, ttl=3600)
+def _load_customers(mtime_ns=None):
+    return backend.load_data(CUSTOMER_DATA_NAME, backend.DEFAULT_CUSTOMER_DATA)
+
+@st.cache_data(show_spinner=False, ttl=3600)
+def _load_vehicles(mtime_ns=None):
+    return backend.load_data(VEHICLE_DATA_NAME, backend.DEFAULT_VEHICLE_DATA)
+
+def normalize_weights(raw):
+    """Stripped, non-empty weight labels, so the item form can just test the list"""
+    return [w.strip() for w in raw if w and w.strip()]
+
+def set_sku_data(sku_data):
+    for sku in sku_data.values():
+        sku['weights'] = normalize_weights(sku.get('weights', []))
+    st.session_state.sku_data = sku_data
+
+def set_customer_data(customer_data):
+    # Interned place keys make the repeated selectbox/dict comparisons pointer checks
+    st.session_state.customer_data = {sys.intern(place): customers for place, customers in customer_data.items()}
+
+def set_vehicle_list(vehicle_list):
+    st.session_state.vehicle_list = vehicle_list
+
+def load_files(paths, mtimes):
+    """Load the given data files into session state and refresh what depends on them"""
     try:
         # Try to load from your existing JSON files
-        sku_data = backend.load_data('sku_data.json', backend.DEFAULT_SKU_DATA)
-        customer_data = backend.load_data('customer_data.json', backend.DEFAULT_CUSTOMER_DATA)
-        vehicle_data = backend.load_data('vehicle_data.json', backend.DEFAULT_VEHICLE_DATA)
-        
-        return sku_data, customer_data, vehicle_data.get("vehicles", [])
+        if SKU_DATA_NAME in paths:
+            set_sku_data(_load_sku(mtimes[SKU_DATA_NAME]))
+        if CUSTOMER_DATA_NAME in paths:
+            set_customer_data(_load_customers(mtimes[CUSTOMER_DATA_NAME]))
+        if VEHICLE_DATA_NAME in paths:
+            set_vehicle_list(_load_vehicles(mtimes[VEHICLE_DATA_NAME]).get("vehicles", []))
     except:
         # Fallback to defaults if files don't exist
-        return backend.DEFAULT_SKU_DATA, backend.DEFAULT_CUSTOMER_DATA, backend.DEFAULT_VEHICLE_DATA.get("vehicles", [])
+        if SKU_DATA_NAME in paths:
+            set_sku_data(backend.DEFAULT_SKU_DATA)
+        if CUSTOMER_DATA_NAME in paths:
+            set_customer_data(backend.DEFAULT_CUSTOMER_DATA)
+        if VEHICLE_DATA_NAME in paths:
+            set_vehicle_list(backend.DEFAULT_VEHICLE_DATA.get("vehicles", []))
+    st.session_state._mtimes = {**st.session_state.get('_mtimes', {}), **{p: mtimes[p] for p in paths}}
+    bump_data_version()
 
 def initialize_session_data():
     """Initialize data in session state from existing files"""
-    if 'data_loaded' not in st.session_state:
-        sku_data, customer_data, vehicle_list = load_existing_data()
-        
-        st.session_state.sku_data = sku_data
-        st.session_state.customer_data = customer_data  
-        st.session_state.vehicle_list = vehicle_list
-        st.session_state.data_loaded = True
+    if '_data_version' not in st.session_state:
+        st.session_state._data_version = 0
+        mtimes = file_mtimes()
+        load_files(tuple(mtimes), mtimes)
+
+# Everything below is derived from sku_data, customer_data and vehicle_list. Handlers that
+# replace or restructure those bump the data version, and each derivation is rebuilt lazily
+# on its next read instead of eagerly (or through a full rerun) after every change.
+def bump_data_version():
+    st.session_state._data_version += 1
+
+def _derived(key, build):
+    """One-slot memo in session state, valid for the current data version"""
+    version = st.session_state._data_version
+    slot = st.session_state.get(key)
+    if slot is None or slot[0] != version:
+        slot = (version, build())
+        st.session_state[key] = slot
+    return slot[1]
+
+def _build_stats():
+    per_place = {place: len(customers) for place, customers in st.session_state.customer_data.items()}
+    return {
+        'total_customers': sum(per_place.values()),
+        'per_place': per_place,
+        'total_skus': len(st.session_state.sku_data),
+        'total_vehicles': len(st.session_state.vehicle_list)
+    }
+
+def get_stats():
+    """Dashboard counters"""
+    return _derived('_stats', _build_stats)
+
+def _first_by_name(customers):
+    # Names are unique per place from the forms, but older data files may repeat one; the first wins
+    by_name = {}
+    for c in customers:
+        by_name.setdefault(c['name'], c)
+    return by_name
+
+def get_customer_index():
+    """{place: {name: customer}} lookup"""
+    return _derived('_customer_index', lambda: {
+        place: _first_by_name(customers)
+        for place, customers in st.session_state.customer_data.items()
+    })
+
+def get_customer_names():
+    """{place: [name, ...]} for the customer selectbox"""
+    return _derived('_customer_names', lambda: {
+        place: list(by_name) for place, by_name in get_customer_index().items()
+    })
+
+def get_place_keys():
+    return _derived('_place_keys', lambda: tuple(st.session_state.customer_data))
+
+def get_sku_keys():
+    return _derived('_sku_keys', lambda: tuple(st.session_state.sku_data))
+
+def get_vehicle_set():
+    return _derived('_vehicle_set', lambda: set(st.session_state.vehicle_list))
 
 def save_data_to_files():
-    """Save current session data back to JSON files"""
+    """Save current session data back to JSON files, skipping files whose content hasn't changed"""
     try:
-        backend.save_data('sku_data.json', st.session_state.sku_data)
-        backend.save_data('customer_data.json', st.session_state.customer_data)
-        backend.save_data('vehicle_data.json', {"vehicles": st.session_state.vehicle_list})
+        payloads = {
+            SKU_DATA_NAME: st.session_state.sku_data,
+            CUSTOMER_DATA_NAME: st.session_state.customer_data,
+            VEHICLE_DATA_NAME: {"vehicles": st.session_state.vehicle_list}
+        }
+        last_saved = st.session_state.setdefault('_last_saved_hash', {})
+        for filename, payload in payloads.items():
+            digest = hashlib.blake2b(backend.dumps_json(payload)).digest()
+            if last_saved.get(filename) != digest:
+                backend.save_data(filename, payload)
+                last_saved[filename] = digest
         return True
     except Exception as e:
         st.error(f"Error saving data: {e}")
         return False
 
+@st.cache_data(show_spinner=False)
+def _serialize_backup(sku_data, customer_data, vehicle_list, stamp):
+    """Backup JSON as bytes; unchanged data on the same day reuses the cached blob"""
+    export_data = {
+        "sku_data": sku_data,
+        "customer_data": customer_data,
+        "vehicle_data": {"vehicles": vehicle_list},
+        "export_date": stamp
+    }
+    return backend.dumps_json_indented(export_data)
+
+def customers_frame(customer_data):
+    """Flatten {place: [customer, ...]} into one row per customer for st.data_editor"""
+    import pandas as pd
+    rows = [(place, c['name'], c['id_type'], c['id_value'])
+            for place, customers in customer_data.items() for c in customers]
+    return pd.DataFrame(rows, columns=["Place", "Name", "ID Type", "ID Value"], dtype=str)
+
+def _blank(value):
+    return not (isinstance(value, str) and value.strip())
+
+def canonical_name(raw, known):
+    """
+    Spell a place or SKU name the way the Add forms do: reuse an existing name that differs
+    only in case (known maps casefolded -> stored name), otherwise title-case it
+    """
+    raw = raw.strip()
+    return known.get(raw.casefold(), raw.title())
+
+def customers_from_frame(df, places):
+    """
+    Regroup edited customer rows by place
+    Returns (customer_data, problems); rows left entirely empty are ignored, and any incomplete
+    or repeated row is reported instead of being dropped, so the caller can refuse to apply
+    """
+    known = {place.casefold(): place for place in places}
+    customer_data, problems, seen = {}, [], set()
+    for row, (place, name, id_type, id_value) in enumerate(df.itertuples(index=False), 1):
+        cells = (place, name, id_value)
+        if all(_blank(v) for v in cells):
+            continue
+        if any(_blank(v) for v in cells):
+            problems.append(f"row {row} needs a place, name and ID value")
+            continue
+        place, name = canonical_name(place, known), name.strip()
+        known.setdefault(place.casefold(), place)
+        if (place, name) in seen:
+            problems.append(f"row {row} repeats '{name}' in {place}")
+            continue
+        seen.add((place, name))
+        customer_data.setdefault(place, []).append({
+            "name": name,
+            "id_type": id_type if isinstance(id_type, str) else "GSTN",
+            "id_value": id_value.strip().upper()
+        })
+    return customer_data, problems
+
+def skus_frame(sku_data):
+    """One row per SKU for st.data_editor; weights shown comma-separated"""
+    import pandas as pd
+    rows = [(name, sku['hsn'], sku['cgst'], sku['sgst'], ', '.join(sku['weights']))
+            for name, sku in sku_data.items()]
+    return pd.DataFrame(rows, columns=["Item", "HSN", "CGST", "SGST", "Weights"])
+
+def skus_from_frame(df, names):
+    """
+    Rebuild the SKU dict from edited rows
+    Returns (sku_data, problems) like customers_from_frame; a repeated item name is a problem,
+    never a silent overwrite
+    """
+    import pandas as pd
+    known = {name.casefold(): name for name in names}
+    sku_data, problems = {}, []
+    for row, (name, hsn, cgst, sgst, weights) in enumerate(df.itertuples(index=False), 1):
+        if _blank(name) and _blank(hsn):
+            continue
+        if _blank(name) or _blank(hsn):
+            problems.append(f"row {row} needs an item name and HSN code")
+            continue
+        name = canonical_name(name, known)
+        known.setdefault(name.casefold(), name)
+        if name in sku_data:
+            problems.append(f"row {row} repeats '{name}'")
+            continue
+        sku_data[name] = {
+            "hsn": hsn.strip(),
+            "cgst": float(cgst) if pd.notna(cgst) else 0.0,
+            "sgst": float(sgst) if pd.notna(sgst) else 0.0,
+            "weights": normalize_weights(weights.split(',')) if isinstance(weights, str) else []
+        }
+    return sku_data, problems
+
+# st.fragment (st.experimental_fragment before 1.37) reruns only the decorated block when its own
+# widgets change; on releases without it the block simply runs as part of the whole script
+_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda fn: fn)
+
+@_fragment
+def _invoice_items_fragment(place_of_supply, customer_name, invoice_no, vehicle_no):
+    """Add Items form, the item table and PDF generation for the Generate Invoice page"""
+    st.subheader("Add Items")
+
+    # Item addition
+    with st.form("add_item_form", clear_on_submit=True):
+        col1, col2, col3, col4 = st.columns(4)
+
+        with col1:
+            items = get_sku_keys()
+            if items:
+                selected_item = st.selectbox("Item", items)
+            else:
+                st.error("No SKUs found. Please add SKUs first.")
+                st.stop()
+
+        with col2:
+            weights = st.session_state.sku_data[selected_item]["weights"]
+            if weights:
+                selected_weight = st.selectbox("Weight", weights)
+            else:
+                selected_weight = st.text_input("Weight", placeholder="Enter weight")
+
+        with col3:
+            quantity = st.number_input("Quantity", min_value=1, value=1)
+
+        with col4:
+            rate = st.number_input("Rate (₹)", min_value=0.0, value=0.0, format="%.2f")
+
+        add_item = st.form_submit_button("Add Item")
+
+    # Initialize invoice items: one list per input field; amount/tax/total are derived
+    if 'invoice_items' not in st.session_state:
+        st.session_state.invoice_items = {field: [] for field in backend.ITEM_INPUT_FIELDS}
+    items = st.session_state.invoice_items
+
+    if add_item and rate > 0:
+        item_name = f"{selected_item} ({selected_weight})" if selected_weight else selected_item
+        item_details = st.session_state.sku_data[selected_item]
+
+        items['name'].append(item_name)
+        items['qty'].append(quantity)
+        items['hsn'].append(item_details['hsn'])
+        items['rate'].append(backend.to_paise(rate))
+        items['cgst'].append(item_details['cgst'])
+        items['sgst'].append(item_details['sgst'])
+        st.success("Item added!")
+
+    # Display current items
+    if items['name']:
+        st.subheader("Invoice Items")
+
+        # Price every row in one vectorised pass
+        priced_items = backend.price_items(items)
+
+        # Display as table; pandas is only imported by the pages that build a DataFrame
+        import pandas as pd
+        money_cols = ['Rate (₹)', 'Amount (₹)', 'Tax (₹)', 'Total (₹)']
+        df = pd.DataFrame(priced_items,
+                          columns=['name', 'qty', 'rate', 'amount', 'tax', 'total'])
+        df.columns = ['Item', 'Qty'] + money_cols
+        df.insert(0, 'S.N.', np.arange(1, len(df) + 1))
+        df[money_cols] = df[money_cols] / 100
+        df['_del'] = False
+
+        # Tick rows to drop them; only the Remove column is editable
+        edited = st.data_editor(
+            df,
+            use_container_width=True,
+            hide_index=True,
+            disabled=['S.N.', 'Item', 'Qty'] + money_cols,
+            column_config={
+                '_del': st.column_config.CheckboxColumn('Remove'),
+                **{col: st.column_config.NumberColumn(col, format="%.2f") for col in money_cols}
+            },
+            key="items_editor"
+        )
+
+        if st.button("Remove Selected Items"):
+            keep = ~edited['_del'].to_numpy()
+            if not keep.all():
+                for field, column in items.items():
+                    items[field] = list(compress(column, keep))
+                del st.session_state["items_editor"]
+                st.rerun()
+
+        # Generate invoice
+        if st.button("🔄 Generate PDF Invoice", type="primary"):
+            try:
+                # Get customer details
+                customer_obj = get_customer_index()[place_of_supply][customer_name]
+
+                # Calculate totals
+                adjusted_items, final_totals, _ = backend.apply_price_adjustments(items)
+
+                # Prepare invoice data
+                invoice_data = {
+                    "meta": {
+                        "no": invoice_no,
+                        "date": datetime.date.today().strftime("%d/%m/%Y"),
+                        "place_of_supply": place_of_supply,
+                        "vehicle_no": vehicle_no
+                    },
+                    "buyer": customer_obj,
+                    "items": adjusted_items,
+                    "totals": final_totals
+                }
+
+                # Generate PDF straight into memory
+                buf = io.BytesIO()
+                pdf_bytes = backend.generate_pdf(invoice_data, output_stream=buf)
+
+                # Offer download
+                filename = f"invoice_{invoice_no}_{datetime.date.today().strftime('%Y%m%d')}.pdf"
+                st.download_button(
+                    label="📥 Download Invoice PDF",
+                    data=pdf_bytes,
+                    file_name=filename,
+                    mime="application/pdf"
+                )
+
+                st.success(f"Invoice #{invoice_no} generated successfully!")
+                # Store a snapshot; the item columns and buyer dict stay live in session state
+                st.session_state.setdefault('invoice_history', []).append(copy.deepcopy(invoice_data))
+
+                # Display totals
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Total Amount", f"₹{final_totals['amount']/100:.2f}")
+                with col2:
+                    st.metric("Total Tax", f"₹{final_totals['tax']/100:.2f}")
+                with col3:
+                    st.metric("Grand Total", f"₹{final_totals['grand_total']/100:.2f}")
+
+                # Clear items
+                if st.button("🗑️ Clear Invoice Items"):
+                    st.session_state.invoice_items = {field: [] for field in backend.ITEM_INPUT_FIELDS}
+                    st.rerun()
+
+            except Exception as e:
+                st.error(f"Error generating invoice: {str(e)}")
+
+
 def main():
     # Initialize data from existing files
     initialize_session_data()
@@ -67,25 +438,42 @@ def main():
                 st.success("Data saved to JSON files!")
             
         if st.button("🔄 Reload from Files"):
-            st.session_state.data_loaded = False
-            st.rerun()
+            # Only files whose mtime moved since the last load are read again
+            mtimes = file_mtimes()
+            changed = [p for p, m in mtimes.items() if st.session_state._mtimes.get(p) != m]
+            if changed:
+                # Bumps the data version, so this same run already renders the reloaded data
+                load_files(changed, mtimes)
+            else:
+                st.toast("Data files unchanged since last load", icon="ℹ️")
         
         # Export data
         if st.button("📥 Download Backup"):
-            export_data = {
-                "sku_data": st.session_state.sku_data,
-                "customer_data": st.session_state.customer_data,
-                "vehicle_data": {"vehicles": st.session_state.vehicle_list},
-                "export_date": datetime.datetime.now().isoformat()
-            }
+            backup_bytes = _serialize_backup(
+                st.session_state.sku_data,
+                st.session_state.customer_data,
+                st.session_state.vehicle_list,
+                datetime.date.today().isoformat()
+            )
             
             filename = f"sukhrani_backup_{datetime.date.today().strftime('%Y%m%d')}.json"
             st.download_button(
                 label="📥 Download JSON Backup",
-                data=json.dumps(export_data, indent=2, ensure_ascii=False),
+                data=backup_bytes,
                 file_name=filename,
                 mime="application/json"
             )
+        
+        # Export invoices generated this session as JSON Lines, encoded only when asked for
+        if st.session_state.get('invoice_history') and st.button("📤 Export Invoices"):
+            ndjson_buf = io.BytesIO()
+            backend.stream_invoices_ndjson(st.session_state.invoice_history, ndjson_buf)
+            st.download_button(
+                label="📤 Export Invoices (NDJSON)",
+                data=ndjson_buf.getvalue(),
+                file_name=f"sukhrani_invoices_{datetime.date.today().strftime('%Y%m%d')}.ndjson",
+                mime="application/x-ndjson"
+            )
     
     # Navigation
     st.sidebar.title("Navigation")
@@ -114,13 +502,13 @@ def main():
                 vehicle_no = st.text_input("Vehicle Number", placeholder="e.g., UP78 JT 9555")
         
         # Customer selection
-        places = list(st.session_state.customer_data.keys())
+        places = get_place_keys()
         if places:
             col1, col2 = st.columns(2)
             with col1:
                 place_of_supply = st.selectbox("Place of Supply", places)
             with col2:
-                customers = [c['name'] for c in st.session_state.customer_data[place_of_supply]]
+                customers = get_customer_names()[place_of_supply]
                 if customers:
                     customer_name = st.selectbox("Customer", customers)
                 else:
@@ -130,157 +518,7 @@ def main():
             st.error("No customers found. Please add customers first.")
             st.stop()
         
-        st.subheader("Add Items")
-        
-        # Item addition
-        with st.form("add_item_form", clear_on_submit=True):
-            col1, col2, col3, col4 = st.columns(4)
-            
-            with col1:
-                items = list(st.session_state.sku_data.keys())
-                if items:
-                    selected_item = st.selectbox("Item", items)
-                else:
-                    st.error("No SKUs found. Please add SKUs first.")
-                    st.stop()
-            
-            with col2:
-                weights = st.session_state.sku_data[selected_item].get("weights", [])
-                if weights and any(w.strip() for w in weights):
-                    selected_weight = st.selectbox("Weight", weights)
-                else:
-                    selected_weight = st.text_input("Weight", placeholder="Enter weight")
-            
-            with col3:
-                quantity = st.number_input("Quantity", min_value=1, value=1)
-            
-            with col4:
-                rate = st.number_input("Rate (₹)", min_value=0.0, value=0.0, format="%.2f")
-            
-            add_item = st.form_submit_button("Add Item")
-        
-        # Initialize invoice items
-        if 'invoice_items' not in st.session_state:
-            st.session_state.invoice_items = []
-        
-        if add_item and rate > 0:
-            item_name = f"{selected_item} ({selected_weight})" if selected_weight else selected_item
-            item_details = st.session_state.sku_data[selected_item]
-            amount = rate * quantity
-            tax = amount * (item_details['cgst'] + item_details['sgst'])
-            
-            new_item = {
-                'sn': len(st.session_state.invoice_items) + 1,
-                'name': item_name,
-                'qty': quantity,
-                'hsn': item_details['hsn'],
-                'rate': rate,
-                'amount': amount,
-                'cgst': item_details['cgst'],
-                'sgst': item_details['sgst'],
-                'tax': tax,
-                'total': amount + tax
-            }
-            
-            st.session_state.invoice_items.append(new_item)
-            st.success("Item added!")
-        
-        # Display current items
-        if st.session_state.invoice_items:
-            st.subheader("Invoice Items")
-            
-            # Display as table
-            df_display = []
-            for item in st.session_state.invoice_items:
-                df_display.append({
-                    'S.N.': item['sn'],
-                    'Item': item['name'],
-                    'Qty': item['qty'],
-                    'Rate (₹)': f"{item['rate']:.2f}",
-                    'Amount (₹)': f"{item['amount']:.2f}",
-                    'Tax (₹)': f"{item['tax']:.2f}",
-                    'Total (₹)': f"{item['total']:.2f}"
-                })
-            
-            st.dataframe(pd.DataFrame(df_display), use_container_width=True)
-            
-            # Remove item
-            col1, col2 = st.columns(2)
-            with col1:
-                if st.session_state.invoice_items:
-                    item_options = [f"{i+1}. {item['name']}" for i, item in enumerate(st.session_state.invoice_items)]
-                    item_to_remove = st.selectbox("Select item to remove", [""] + item_options)
-            
-            with col2:
-                if st.button("Remove Item") and item_to_remove:
-                    index = int(item_to_remove.split(".")[0]) - 1
-                    st.session_state.invoice_items.pop(index)
-                    # Reindex
-                    for i, item in enumerate(st.session_state.invoice_items):
-                        item['sn'] = i + 1
-                    st.rerun()
-            
-            # Generate invoice
-            if st.button("🔄 Generate PDF Invoice", type="primary"):
-                try:
-                    # Get customer details
-                    customer_obj = next(c for c in st.session_state.customer_data[place_of_supply] 
-                                      if c['name'] == customer_name)
-                    
-                    # Calculate totals
-                    adjusted_items, final_totals, _ = backend.apply_price_adjustments(st.session_state.invoice_items)
-                    
-                    # Prepare invoice data
-                    invoice_data = {
-                        "meta": {
-                            "no": invoice_no,
-                            "date": datetime.date.today().strftime("%d/%m/%Y"),
-                            "place_of_supply": place_of_supply,
-                            "vehicle_no": vehicle_no
-                        },
-                        "buyer": customer_obj,
-                        "items": adjusted_items,
-                        "totals": final_totals
-                    }
-                    
-                    # Generate PDF
-                    with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp:
-                        pdf_path = backend.generate_pdf(invoice_data, tmp.name)
-                        
-                        # Read PDF
-                        with open(tmp.name, 'rb') as pdf_file:
-                            pdf_bytes = pdf_file.read()
-                        
-                        # Offer download
-                        filename = f"invoice_{invoice_no}_{datetime.date.today().strftime('%Y%m%d')}.pdf"
-                        st.download_button(
-                            label="📥 Download Invoice PDF",
-                            data=pdf_bytes,
-                            file_name=filename,
-                            mime="application/pdf"
-                        )
-                        
-                        st.success(f"Invoice #{invoice_no} generated successfully!")
-                        
-                        # Display totals
-                        col1, col2, col3 = st.columns(3)
-                        with col1:
-                            st.metric("Total Amount", f"₹{final_totals['amount']:.2f}")
-                        with col2:
-                            st.metric("Total Tax", f"₹{final_totals['tax']:.2f}")
-                        with col3:
-                            st.metric("Grand Total", f"₹{final_totals['grand_total']:.2f}")
-                        
-                        # Clear items
-                        if st.button("🗑️ Clear Invoice Items"):
-                            st.session_state.invoice_items = []
-                            st.rerun()
-                        
-                        # Cleanup
-                        os.unlink(tmp.name)
-                        
-                except Exception as e:
-                    st.error(f"Error generating invoice: {str(e)}")
+        _invoice_items_fragment(place_of_supply, customer_name, invoice_no, vehicle_no)
     
     # Manage Customers Page
     elif page == "Manage Customers":
@@ -309,36 +547,44 @@ def main():
                             "id_value": id_value.upper()
                         }
                         
-                        if place_of_supply.title() not in st.session_state.customer_data:
-                            st.session_state.customer_data[place_of_supply.title()] = []
-                        
-                        st.session_state.customer_data[place_of_supply.title()].append(new_customer)
-                        st.success(f"Customer '{customer_name}' added successfully!")
+                        place_key = sys.intern(place_of_supply.title())
+                        if customer_name in get_customer_index().get(place_key, {}):
+                            st.error(f"Customer '{customer_name}' already exists in {place_key}")
+                        else:
+                            st.session_state.customer_data.setdefault(place_key, []).append(new_customer)
+                            bump_data_version()
+                            st.success(f"Customer '{customer_name}' added successfully!")
                     else:
                         st.error("All fields are required")
         
         with tab2:
             st.subheader("All Customers")
-            total_customers = sum(len(customers) for customers in st.session_state.customer_data.values())
-            st.info(f"Total customers: {total_customers}")
+            st.info(f"Total customers: {get_stats()['total_customers']}")
             
-            for place, customers in st.session_state.customer_data.items():
-                with st.expander(f"📍 {place} ({len(customers)} customers)"):
-                    for i, customer in enumerate(customers):
-                        col1, col2 = st.columns([3, 1])
-                        with col1:
-                            st.write(f"**{customer['name']}**")
-                            st.write(f"   {customer['id_type']}: {customer['id_value']}")
-                        with col2:
-                            if st.button(f"Delete", key=f"del_{place}_{i}"):
-                                st.session_state.customer_data[place].pop(i)
-                                st.rerun()
+            # One editor for all customers: edit cells or delete rows, then apply
+            edited = st.data_editor(
+                customers_frame(st.session_state.customer_data),
+                num_rows="dynamic",
+                use_container_width=True,
+                hide_index=True,
+                column_config={"ID Type": st.column_config.SelectboxColumn("ID Type", options=["GSTN", "AADHAR"])},
+                key="cust_editor"
+            )
+            if st.button("Apply Changes", key="apply_cust_editor"):
+                customer_data, problems = customers_from_frame(edited, st.session_state.customer_data)
+                if problems:
+                    st.error(f"Fix these rows before applying: {'; '.join(problems)}")
+                else:
+                    set_customer_data(customer_data)
+                    bump_data_version()
+                    del st.session_state["cust_editor"]
+                    st.rerun()
         
         with tab3:
             st.subheader("Edit Customer")
             
             # Select customer to edit
-            places = list(st.session_state.customer_data.keys())
+            places = get_place_keys()
             if places:
                 selected_place = st.selectbox("Select Place", places, key="edit_place")
                 customers = st.session_state.customer_data[selected_place]
@@ -364,7 +610,14 @@ def main():
                                 new_id_value = st.text_input("ID Number", value=customer['id_value'])
                             
                             if st.form_submit_button("Update Customer"):
-                                if all([new_name, new_place, new_id_value]):
+                                new_place = canonical_name(new_place, {p.casefold(): p for p in places})
+                                duplicate = any(
+                                    c['name'] == new_name and c is not customer
+                                    for c in st.session_state.customer_data.get(new_place, [])
+                                )
+                                if duplicate:
+                                    st.error(f"Customer '{new_name}' already exists in {new_place}")
+                                elif all([new_name, new_place, new_id_value]):
                                     # Remove from old location
                                     st.session_state.customer_data[selected_place].pop(idx)
                                     if not st.session_state.customer_data[selected_place]:
@@ -377,10 +630,9 @@ def main():
                                         "id_value": new_id_value.upper()
                                     }
                                     
-                                    if new_place not in st.session_state.customer_data:
-                                        st.session_state.customer_data[new_place] = []
-                                    
-                                    st.session_state.customer_data[new_place].append(updated_customer)
+                                    new_place = sys.intern(new_place)
+                                    st.session_state.customer_data.setdefault(new_place, []).append(updated_customer)
+                                    bump_data_version()
                                     st.success("Customer updated successfully!")
                                     st.rerun()
                                 else:
@@ -413,7 +665,7 @@ def main():
                 
                 if st.form_submit_button("Add SKU"):
                     if all([item_name, hsn_code]):
-                        weights = [w.strip() for w in weights_input.split(',') if w.strip()] if weights_input else []
+                        weights = normalize_weights(weights_input.split(','))
                         
                         new_sku = {
                             "hsn": hsn_code,
@@ -423,41 +675,40 @@ def main():
                         }
                         
                         st.session_state.sku_data[item_name.title()] = new_sku
+                        bump_data_version()
                         st.success(f"SKU '{item_name}' added successfully!")
                     else:
                         st.error("Item name and HSN code are required")
         
         with tab2:
             st.subheader("All SKUs")
-            st.info(f"Total SKUs: {len(st.session_state.sku_data)}")
+            st.info(f"Total SKUs: {get_stats()['total_skus']}")
             
-            for item_name, sku_data in st.session_state.sku_data.items():
-                with st.expander(f"📦 {item_name}"):
-                    col1, col2, col3, col4 = st.columns(4)
-                    
-                    with col1:
-                        st.write(f"**HSN:** {sku_data['hsn']}")
-                        st.write(f"**CGST:** {sku_data['cgst']*100}%")
-                    
-                    with col2:
-                        st.write(f"**SGST:** {sku_data['sgst']*100}%")
-                        st.write(f"**Total Tax:** {(sku_data['cgst']+sku_data['sgst'])*100}%")
-                    
-                    with col3:
-                        if sku_data['weights']:
-                            st.write(f"**Weights:** {', '.join(sku_data['weights'])}")
-                        else:
-                            st.write("**Weights:** N/A")
-                    
-                    with col4:
-                        if st.button(f"Delete SKU", key=f"del_sku_{item_name}"):
-                            del st.session_state.sku_data[item_name]
-                            st.rerun()
+            edited = st.data_editor(
+                skus_frame(st.session_state.sku_data),
+                num_rows="dynamic",
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    "CGST": st.column_config.NumberColumn("CGST", min_value=0.0, max_value=1.0, format="%.3f"),
+                    "SGST": st.column_config.NumberColumn("SGST", min_value=0.0, max_value=1.0, format="%.3f")
+                },
+                key="sku_editor"
+            )
+            if st.button("Apply Changes", key="apply_sku_editor"):
+                sku_data, problems = skus_from_frame(edited, st.session_state.sku_data)
+                if problems:
+                    st.error(f"Fix these rows before applying: {'; '.join(problems)}")
+                else:
+                    set_sku_data(sku_data)
+                    bump_data_version()
+                    del st.session_state["sku_editor"]
+                    st.rerun()
         
         with tab3:
             st.subheader("Edit SKU")
             
-            sku_names = list(st.session_state.sku_data.keys())
+            sku_names = get_sku_keys()
             if sku_names:
                 selected_sku = st.selectbox("Select SKU to Edit", sku_names, key="edit_sku_select")
                 
@@ -480,7 +731,7 @@ def main():
                         
                         if st.form_submit_button("Update SKU"):
                             if all([new_name, new_hsn]):
-                                new_weights = [w.strip() for w in new_weights_str.split(',') if w.strip()] if new_weights_str else []
+                                new_weights = normalize_weights(new_weights_str.split(','))
                                 
                                 updated_sku = {
                                     "hsn": new_hsn,
@@ -494,6 +745,7 @@ def main():
                                     del st.session_state.sku_data[selected_sku]
                                 
                                 st.session_state.sku_data[new_name] = updated_sku
+                                bump_data_version()
                                 st.success("SKU updated successfully!")
                                 st.rerun()
                             else:
@@ -523,10 +775,13 @@ def main():
                 
                 if st.form_submit_button("Add Vehicle"):
                     if all([code, series, number]):
-                        vehicle_number = f"{code.upper()} {series.upper()} {number}"
+                        vehicle_number = normalize_vehicle(code, series, number)
                         
-                        if vehicle_number not in st.session_state.vehicle_list:
+                        if not vehicle_number:
+                            st.error("Code and series must be letters and digits only")
+                        elif vehicle_number not in get_vehicle_set():
                             st.session_state.vehicle_list.append(vehicle_number)
+                            bump_data_version()
                             st.success(f"Vehicle '{vehicle_number}' added successfully!")
                         else:
                             st.error("Vehicle already exists")
@@ -535,16 +790,35 @@ def main():
         
         with tab2:
             st.subheader("All Vehicles")
-            st.info(f"Total vehicles: {len(st.session_state.vehicle_list)}")
+            st.info(f"Total vehicles: {get_stats()['total_vehicles']}")
             
-            for i, vehicle in enumerate(st.session_state.vehicle_list):
-                col1, col2 = st.columns([3, 1])
-                with col1:
-                    st.write(f"🚛 {vehicle}")
-                with col2:
-                    if st.button("Delete", key=f"del_vehicle_{i}"):
-                        st.session_state.vehicle_list.pop(i)
-                        st.rerun()
+            import pandas as pd
+            edited = st.data_editor(
+                pd.DataFrame({"Vehicle": st.session_state.vehicle_list}, dtype=str),
+                num_rows="dynamic",
+                use_container_width=True,
+                hide_index=True,
+                key="vehicle_editor"
+            )
+            if st.button("Apply Changes", key="apply_vehicle_editor"):
+                vehicles, invalid = [], []
+                for raw in edited["Vehicle"].dropna():
+                    if not raw.strip():
+                        continue
+                    parts = raw.split(None, 2)
+                    vehicle_number = normalize_vehicle(*parts) if len(parts) == 3 else None
+                    if not vehicle_number:
+                        invalid.append(raw)
+                    elif vehicle_number not in vehicles:
+                        vehicles.append(vehicle_number)
+                if invalid:
+                    st.error(f"Fix these vehicle numbers before applying: {', '.join(invalid)}")
+                else:
+                    # Repeated rows collapse into one entry
+                    set_vehicle_list(vehicles)
+                    bump_data_version()
+                    del st.session_state["vehicle_editor"]
+                    st.rerun()
         
         with tab3:
             st.subheader("Edit Vehicle")
@@ -577,10 +851,16 @@ def main():
                         
                         if st.form_submit_button("Update Vehicle"):
                             if all([new_code, new_series, new_number]):
-                                new_vehicle = f"{new_code.upper()} {new_series.upper()} {new_number}"
-                                st.session_state.vehicle_list[idx] = new_vehicle
-                                st.success("Vehicle updated successfully!")
-                                st.rerun()
+                                new_vehicle = normalize_vehicle(new_code, new_series, new_number)
+                                if not new_vehicle:
+                                    st.error("Code and series must be letters and digits only")
+                                elif new_vehicle != current_vehicle and new_vehicle in get_vehicle_set():
+                                    st.error("Vehicle already exists")
+                                else:
+                                    st.session_state.vehicle_list[idx] = new_vehicle
+                                    bump_data_version()
+                                    st.success("Vehicle updated successfully!")
+                                    st.rerun()
                             else:
                                 st.error("All fields are required")
             else:
@@ -590,17 +870,17 @@ def main():
     elif page == "Dashboard":
         st.header("📊 Dashboard")
         
+        stats = get_stats()
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            st.metric("Total SKUs", len(st.session_state.sku_data))
+            st.metric("Total SKUs", stats['total_skus'])
         
         with col2:
-            total_customers = sum(len(customers) for customers in st.session_state.customer_data.values())
-            st.metric("Total Customers", total_customers)
+            st.metric("Total Customers", stats['total_customers'])
         
         with col3:
-            st.metric("Total Vehicles", len(st.session_state.vehicle_list))
+            st.metric("Total Vehicles", stats['total_vehicles'])
         
         # Display data summary
         st.subheader("Data Summary")
@@ -609,12 +889,12 @@ def main():
         
         with col1:
             st.write("**Customers by Location:**")
-            for place, customers in st.session_state.customer_data.items():
-                st.write(f"• {place}: {len(customers)} customers")
+            for place, count in stats['per_place'].items():
+                st.write(f"• {place}: {count} customers")
         
         with col2:
             st.write("**Recent SKUs:**")
-            for i, (name, data) in enumerate(list(st.session_state.sku_data.items())[:5]):
+            for name, data in islice(st.session_state.sku_data.items(), 5):
                 st.write(f"• {name} (HSN: {data['hsn']})")
         
         st.info("💡 Remember to click 'Save to Files' to persist your changes to JSON files!")
@@ -0,0 +1,82 @@
+import io
+import os
+import re
+import shutil
+
+import pytest
+
+import invoice_app as backend
+
+
+def _invoice(buyer_name, item_name):
+    items = {
+        'name': [item_name], 'qty': [2], 'hsn': ['2103'], 'rate': [12550],
+        'cgst': [0.025], 'sgst': [0.025]
+    }
+    items, totals, _ = backend.apply_price_adjustments(items)
+    return {
+        "meta": {"no": 101, "date": "15/10/2026", "place_of_supply": "Kanpur", "vehicle_no": "UP78 JT 9555"},
+        "buyer": {"name": buyer_name, "id_type": "GSTN", "id_value": "09AUHPP5426C1ZM"},
+        "items": items,
+        "totals": totals
+    }
+
+
+def test_generate_pdf_latin_names():
+    pdf_bytes = backend.generate_pdf(_invoice("Prakash & Sons", "Tomato Sauce (4.5 Kg)"), output_stream=io.BytesIO())
+    assert pdf_bytes.startswith(b"%PDF")
+
+
+def test_generate_pdf_non_latin_buyer_name():
+    # Core fonts can't encode Devanagari; the invoice must still render
+    pdf_bytes = backend.generate_pdf(_invoice("प्रकाश", "टमाटर सॉस ₹"), output_stream=io.BytesIO())
+    assert pdf_bytes.startswith(b"%PDF")
+
+
+def test_line_tax_rounds_half_up():
+    items = {
+        'name': ['A', 'B'], 'qty': [1, 1], 'hsn': ['2103', '2103'],
+        'rate': [backend.to_paise(12.50), backend.to_paise(13.50)],
+        'cgst': [0.025, 0.025], 'sgst': [0.025, 0.025]
+    }
+    assert backend.price_items(items)['tax'] == [63, 68]
+    assert backend.to_paise(12.345) == 1235
+
+
+def test_bulk_same_number_and_date_get_distinct_files(tmp_path):
+    invoices = [_invoice("Prakash & Sons", "Tomato Sauce"), _invoice("Gupta Traders", "Vinegar")]
+    paths = backend.generate_pdfs_bulk(invoices, str(tmp_path))
+    assert len(set(paths)) == 2
+    assert all(os.path.isfile(p) for p in paths)
+
+
+def test_generate_pdf_recreates_removed_cached_directory(tmp_path):
+    folder = tmp_path / "invoices"
+    backend.generate_pdf(_invoice("Prakash & Sons", "Tomato Sauce"), str(folder / "a.pdf"))
+    shutil.rmtree(folder)
+    path = backend.generate_pdf(_invoice("Prakash & Sons", "Tomato Sauce"), str(folder / "b.pdf"))
+    assert os.path.isfile(path)
+
+
+def test_price_items_does_not_share_columns_with_caller():
+    items = {
+        'name': ['A'], 'qty': [1], 'hsn': ['2103'], 'rate': [100],
+        'cgst': [0.0], 'sgst': [0.0]
+    }
+    priced = backend.price_items(items)
+    items['name'].append('B')
+    items['qty'].append(1)
+    assert priced['name'] == ['A']
+    assert priced['qty'] == [1]
+
+
+def test_batch_renders_one_page_per_invoice():
+    invoices = [_invoice("Prakash & Sons", "Tomato Sauce"), _invoice("Gupta Traders", "Vinegar")]
+    pdf_bytes = backend.generate_pdf_batch(invoices, output_stream=io.BytesIO())
+    assert pdf_bytes.startswith(b"%PDF")
+    assert len(re.findall(rb"/Type\s*/Page\b", pdf_bytes)) == 2
+
+
+def test_batch_without_a_sink_is_rejected():
+    with pytest.raises(ValueError):
+        backend.generate_pdf_batch([_invoice("Prakash & Sons", "Tomato Sauce")])
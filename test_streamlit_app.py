@@ -0,0 +1,16 @@
+from streamlit_app import normalize_vehicle
+
+
+def test_normalize_vehicle_upper_cases_code_and_series_only():
+    assert normalize_vehicle(" up78 ", "jt", " 9555a ") == "UP78 JT 9555a"
+
+
+def test_normalize_vehicle_rejects_spaces_inside_code_or_series():
+    assert normalize_vehicle("up 78", "jt", "1") is None
+    assert normalize_vehicle("up78", "j t", "1") is None
+
+
+def test_normalize_vehicle_rejects_missing_or_non_alphanumeric_parts():
+    assert normalize_vehicle("up-78", "jt", "1") is None
+    assert normalize_vehicle("up78", "", "1") is None
+    assert normalize_vehicle("up78", "jt", " ") is None